@@ -1,15 +1,28 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import json
+import re
 from typing import Dict, List, Tuple
 import logging
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class ClimateRiskScreeningTool:
+    # ESG risk / opportunity thresholds
+    HIGH_CARBON_INTENSITY = 100
+    HIGH_PHYSICAL_RISK = 7
+    HIGH_TRANSITION_RISK = 6
+    LOW_CARBON_INTENSITY = 50
+    HIGH_CLIMATE_RISK_SCORE = 8
+    MODERATE_CLIMATE_RISK_SCORE = 5
+
     def __init__(self):
         # Initialize ESG Exclusion List
         self.esg_exclusion_list = {
@@ -34,71 +47,80 @@ class ClimateRiskScreeningTool:
             }
         }
 
-    def load_company_data(self, company_data: Dict) -> pd.DataFrame:
+        # Compile one matcher per exclusion category for screen_esg_exclusions
+        self._esg_patterns = {
+            category: re.compile('|'.join(map(re.escape, industries)))
+            for category, industries in self.esg_exclusion_list.items()
+        }
+
+        # Precompute score column names and weight vectors for calculate_climate_risk_score
+        physical = self.climate_risk_factors['physical_risk']
+        transition = self.climate_risk_factors['transition_risk']
+        self._phys_names = [f"{factor}_score" for factor in physical]
+        self._phys_w = np.array(list(physical.values()), dtype=np.float64)
+        self._trans_names = [f"{factor}_score" for factor in transition]
+        self._trans_w = np.array(list(transition.values()), dtype=np.float64)
+
+    def load_company_data(self, company_data: Dict) -> Dict:
         """Load and validate company data."""
         try:
-            df = pd.DataFrame([company_data])
-            required_columns = ['company_name', 'industry', 'location', 'revenue', 
-                              'carbon_footprint', 'physical_risk_score', 
-                              'transition_risk_score']
-            if not all(col in df.columns for col in required_columns):
-                raise ValueError("Missing required columns in company data")
-            return df
+            required_columns = {'company_name', 'industry', 'location', 'revenue', 
+                                'carbon_footprint', 'physical_risk_score', 
+                                'transition_risk_score'}
+            missing = required_columns - company_data.keys()
+            if missing:
+                raise ValueError(f"Missing required columns in company data: {', '.join(sorted(missing))}")
+            return company_data
         except Exception as e:
             logger.error(f"Error loading company data: {str(e)}")
             raise
 
-    def screen_esg_exclusions(self, company_data: pd.DataFrame) -> Tuple[bool, List[str]]:
+    def screen_esg_exclusions(self, industry_lower: str) -> Tuple[bool, List[str]]:
         """Screen company against ESG exclusion list."""
-        violations = []
-        company_industry = company_data['industry'].iloc[0].lower()
-        
-        for category, industries in self.esg_exclusion_list.items():
-            if any(industry in company_industry for industry in industries):
-                violations.append(category)
+        violations = [
+            category for category, pattern in self._esg_patterns.items()
+            if pattern.search(industry_lower)
+        ]
         
         return len(violations) == 0, violations
 
-    def calculate_climate_risk_score(self, company_data: pd.DataFrame) -> float:
+    def calculate_climate_risk_score(self, company_data: Dict) -> float:
         """Calculate weighted climate risk score."""
         try:
-            physical_score = sum(
-                company_data[f"{factor}_score"].iloc[0] * weight 
-                for factor, weight in self.climate_risk_factors['physical_risk'].items()
-            )
-            transition_score = sum(
-                company_data[f"{factor}_score"].iloc[0] * weight 
-                for factor, weight in self.climate_risk_factors['transition_risk'].items()
-            )
-            return 0.6 * physical_score + 0.4 * transition_score
+            physical_values = np.fromiter((company_data[name] for name in self._phys_names),
+                                          dtype=np.float64, count=len(self._phys_names))
+            transition_values = np.fromiter((company_data[name] for name in self._trans_names),
+                                            dtype=np.float64, count=len(self._trans_names))
+            return float(0.6 * (physical_values @ self._phys_w) + 0.4 * (transition_values @ self._trans_w))
         except Exception as e:
             logger.error(f"Error calculating climate risk score: {str(e)}")
             return 0.0
 
-    def identify_esg_risks(self, company_data: pd.DataFrame) -> List[str]:
+    def identify_esg_risks(self, physical_risk_score: float, transition_risk_score: float,
+                           carbon_intensity: float) -> List[str]:
         """Identify specific ESG risks based on thresholds."""
         risks = []
         
-        if company_data['carbon_footprint'].iloc[0] / company_data['revenue'].iloc[0] > 100:
+        if carbon_intensity > self.HIGH_CARBON_INTENSITY:
             risks.append("High carbon intensity")
         
-        if company_data['physical_risk_score'].iloc[0] > 7:
+        if physical_risk_score > self.HIGH_PHYSICAL_RISK:
             risks.append("High physical climate risk")
             
-        if company_data['transition_risk_score'].iloc[0] > 6:
+        if transition_risk_score > self.HIGH_TRANSITION_RISK:
             risks.append("High transition risk")
             
         return risks
 
-    def assess_opportunities(self, company_data: pd.DataFrame) -> List[str]:
+    def assess_opportunities(self, industry_lower: str, carbon_intensity: float) -> List[str]:
         """Identify climate-related opportunities."""
         opportunities = []
         
-        if 'renewable' in company_data['industry'].iloc[0].lower():
+        if 'renewable' in industry_lower:
             opportunities.append("Renewable energy market growth")
-        if company_data['carbon_footprint'].iloc[0] / company_data['revenue'].iloc[0] < 50:
+        if carbon_intensity < self.LOW_CARBON_INTENSITY:
             opportunities.append("Low-carbon competitive advantage")
-        if 'green' in company_data['industry'].iloc[0].lower():
+        if 'green' in industry_lower:
             opportunities.append("Green technology innovation")
             
         return opportunities
@@ -106,15 +128,30 @@ class ClimateRiskScreeningTool:
     def generate_report(self, company_data: Dict) -> Dict:
         """Generate comprehensive climate risk report."""
         try:
-            df = self.load_company_data(company_data)
+            company_data = self.load_company_data(company_data)
             
-            esg_compliant, esg_violations = self.screen_esg_exclusions(df)
-            climate_risk_score = self.calculate_climate_risk_score(df)
-            esg_risks = self.identify_esg_risks(df)
-            opportunities = self.assess_opportunities(df)
+            # Derived values shared by the screening, risk and opportunity checks
+            carbon_footprint = company_data['carbon_footprint']
+            revenue = company_data['revenue']
+            if revenue:
+                carbon_intensity = carbon_footprint / revenue
+            else:
+                # Zero revenue: any footprint is unbounded intensity, 0/0 matches no threshold
+                carbon_intensity = float('inf') if carbon_footprint else float('nan')
+            industry_lower = company_data['industry'].lower()
+
+            esg_compliant, esg_violations = self.screen_esg_exclusions(industry_lower)
+            climate_risk_score = self.calculate_climate_risk_score(company_data)
+
+            esg_risks = self.identify_esg_risks(
+                company_data['physical_risk_score'],
+                company_data['transition_risk_score'],
+                carbon_intensity
+            )
+            opportunities = self.assess_opportunities(industry_lower, carbon_intensity)
             
             report = {
-                'company_name': df['company_name'].iloc[0],
+                'company_name': company_data['company_name'],
                 'esg_compliant': esg_compliant,
                 'esg_violations': esg_violations,
                 'climate_risk_score': round(climate_risk_score, 2),
@@ -134,79 +171,92 @@ class ClimateRiskScreeningTool:
         """Generate investment recommendation based on screening results."""
         if not esg_compliant:
             return "Do not proceed - ESG exclusion list violations detected"
-        if climate_risk_score > 8:
+        if climate_risk_score > self.HIGH_CLIMATE_RISK_SCORE:
             return "High risk - requires detailed due diligence"
-        elif climate_risk_score > 5:
+        elif climate_risk_score > self.MODERATE_CLIMATE_RISK_SCORE:
             return "Moderate risk - proceed with caution"
         else:
             return "Low risk - suitable for investment consideration"
 
+@st.cache_resource
+def get_tool() -> ClimateRiskScreeningTool:
+    """Return a screening tool shared across Streamlit reruns."""
+    return ClimateRiskScreeningTool()
+
+@st.cache_data
+def serialize_report(report: Dict) -> bytes:
+    """Serialize a report to indented JSON bytes for download."""
+    if orjson is not None:
+        return orjson.dumps(report, option=orjson.OPT_INDENT_2)
+    return json.dumps(report, indent=2, ensure_ascii=False).encode()
+
 # Streamlit App
 st.title("Climate Risk Pre-Screening Tool")
 st.markdown("Enter company details to assess climate risks, ESG compliance, and opportunities.")
 
-# Input form
-with st.form("company_form"):
-    st.subheader("Company Information")
-    company_name = st.text_input("Company Name", value="GreenTech Solutions")
-    industry = st.text_input("Industry", value="Renewable Energy")
-    location = st.text_input("Location", value="California")
-    revenue = st.number_input("Revenue (USD)", min_value=0.0, value=100000000.0, step=1000000.0)
-    carbon_footprint = st.number_input("Carbon Footprint (tons CO2e)", min_value=0.0, value=2000000.0, step=10000.0)
-
-    st.subheader("Risk Scores (0-10)")
-    physical_risk_score = st.slider("Physical Risk Score", 0.0, 10.0, 4.5)
-    transition_risk_score = st.slider("Transition Risk Score", 0.0, 10.0, 3.2)
-    flood_risk_score = st.slider("Flood Risk Score", 0.0, 10.0, 5.0)
-    heat_stress_score = st.slider("Heat Stress Score", 0.0, 10.0, 4.0)
-    sea_level_rise_score = st.slider("Sea Level Rise Score", 0.0, 10.0, 3.5)
-    wildfire_risk_score = st.slider("Wildfire Risk Score", 0.0, 10.0, 5.0)
-    carbon_price_exposure_score = st.slider("Carbon Price Exposure Score", 0.0, 10.0, 3.0)
-    regulatory_compliance_score = st.slider("Regulatory Compliance Score", 0.0, 10.0, 3.5)
-    technology_disruption_score = st.slider("Technology Disruption Score", 0.0, 10.0, 3.0)
-
-    submitted = st.form_submit_button("Generate Report")
-
-# Process form submission
-if submitted:
-    company_data = {
-        'company_name': company_name,
-        'industry': industry,
-        'location': location,
-        'revenue': revenue,
-        'carbon_footprint': carbon_footprint,
-        'physical_risk_score': physical_risk_score,
-        'transition_risk_score': transition_risk_score,
-        'flood_risk_score': flood_risk_score,
-        'heat_stress_score': heat_stress_score,
-        'sea_level_rise_score': sea_level_rise_score,
-        'wildfire_risk_score': wildfire_risk_score,
-        'carbon_price_exposure_score': carbon_price_exposure_score,
-        'regulatory_compliance_score': regulatory_compliance_score,
-        'technology_disruption_score': technology_disruption_score
-    }
+# Form widget keys, reused as the keys of the company_data dict
+FIELDS = (
+    'company_name', 'industry', 'location', 'revenue', 'carbon_footprint',
+    'physical_risk_score', 'transition_risk_score',
+    'flood_risk_score', 'heat_stress_score', 'sea_level_rise_score', 'wildfire_risk_score',
+    'carbon_price_exposure_score', 'regulatory_compliance_score', 'technology_disruption_score'
+)
+
+# Submitting the company form reruns just the form and its report, not the page title
+@st.fragment
+def company_form():
+    # Input form
+    with st.form("company_form"):
+        st.subheader("Company Information")
+        st.text_input("Company Name", value="GreenTech Solutions", key="company_name")
+        st.text_input("Industry", value="Renewable Energy", key="industry")
+        st.text_input("Location", value="California", key="location")
+        st.number_input("Revenue (USD)", min_value=0.0, value=100000000.0, step=1000000.0, key="revenue")
+        st.number_input("Carbon Footprint (tons CO2e)", min_value=0.0, value=2000000.0, step=10000.0, key="carbon_footprint")
+
+        st.subheader("Risk Scores (0-10)")
+        st.slider("Physical Risk Score", 0.0, 10.0, 4.5, key="physical_risk_score")
+        st.slider("Transition Risk Score", 0.0, 10.0, 3.2, key="transition_risk_score")
+        st.slider("Flood Risk Score", 0.0, 10.0, 5.0, key="flood_risk_score")
+        st.slider("Heat Stress Score", 0.0, 10.0, 4.0, key="heat_stress_score")
+        st.slider("Sea Level Rise Score", 0.0, 10.0, 3.5, key="sea_level_rise_score")
+        st.slider("Wildfire Risk Score", 0.0, 10.0, 5.0, key="wildfire_risk_score")
+        st.slider("Carbon Price Exposure Score", 0.0, 10.0, 3.0, key="carbon_price_exposure_score")
+        st.slider("Regulatory Compliance Score", 0.0, 10.0, 3.5, key="regulatory_compliance_score")
+        st.slider("Technology Disruption Score", 0.0, 10.0, 3.0, key="technology_disruption_score")
+
+        submitted = st.form_submit_button("Generate Report")
+
+    # Process form submission
+    if not submitted:
+        return
+    company_data = {k: st.session_state[k] for k in FIELDS}
 
     try:
-        # Initialize tool and generate report
-        tool = ClimateRiskScreeningTool()
+        # Fetch cached tool and generate report
+        tool = get_tool()
         report = tool.generate_report(company_data)
 
         # Display report
         st.subheader("Climate Risk Screening Report")
-        st.markdown(f"**Company Name**: {report['company_name']}")
-        st.markdown(f"**ESG Compliant**: {'Yes' if report['esg_compliant'] else 'No'}")
-        st.markdown(f"**ESG Violations**: {', '.join(report['esg_violations']) if report['esg_violations'] else 'None'}")
-        st.markdown(f"**Climate Risk Score**: {report['climate_risk_score']}/10")
-        st.markdown(f"**ESG Risks**: {', '.join(report['esg_risks']) if report['esg_risks'] else 'None'}")
-        st.markdown(f"**Climate Opportunities**: {', '.join(report['climate_opportunities']) if report['climate_opportunities'] else 'None'}")
-        st.markdown(f"**Recommendation**: {report['recommendation']}")
+        st.markdown(
+            f"**Company Name**: {report['company_name']}\n\n"
+            f"**ESG Compliant**: {'Yes' if report['esg_compliant'] else 'No'}\n\n"
+            f"**ESG Violations**: {', '.join(report['esg_violations'] or ['None'])}\n\n"
+            f"**Climate Risk Score**: {report['climate_risk_score']}/10\n\n"
+            f"**ESG Risks**: {', '.join(report['esg_risks'] or ['None'])}\n\n"
+            f"**Climate Opportunities**: {', '.join(report['climate_opportunities'] or ['None'])}\n\n"
+            f"**Recommendation**: {report['recommendation']}"
+        )
 
         # Option to download report as JSON
         st.download_button(
             label="Download Report (JSON)",
-            data=json.dumps(report, indent=4),
+            data=serialize_report(report),
             file_name=f"{report['company_name']}_climate_risk_report.json",
             mime="application/json"
         )
     except Exception as e:
-        st.error(f"Error generating report: {str(e)}")
\ No newline at end of file
+        st.error(f"Error generating report: {str(e)}")
+
+company_form()
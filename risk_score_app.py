@@ -2,12 +2,56 @@
 import streamlit as st
 import requests
 import os
+import threading
+import logging
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
-# Load environment variables
-load_dotenv()
-DataPulse_API_KEY = os.getenv("DataPulse_API_KEY")
-SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
+logger = logging.getLogger(__name__)
+
+# Load environment variables (once per server process, not on every rerun)
+@st.cache_resource
+def _env():
+    load_dotenv()
+    return os.getenv("DataPulse_API_KEY"), os.getenv("SLACK_WEBHOOK_URL")
+
+DataPulse_API_KEY, SLACK_WEBHOOK_URL = _env()
+
+# (connect, read) timeout in seconds so a slow upstream can't hang the worker
+HTTP_TIMEOUT = (2, 5)
+
+# Shared HTTP session so reruns reuse pooled connections instead of new TLS handshakes
+@st.cache_resource
+def _http():
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+    )
+    session.mount("https://", adapter)
+    return session
+
+def _send_slack_alert(session: requests.Session, alert_data: dict) -> None:
+    """Post an alert to Slack, logging failures since no UI is attached."""
+    try:
+        response = session.post(SLACK_WEBHOOK_URL, json=alert_data, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logger.error(f"Slack alert failed: {str(e)}")
+
+# Repeat lookups for the same user within a minute skip the network round-trip
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_risk(user_id: str) -> dict:
+    response = _http().get(
+        "https://api.DataPulse.com/v10/kenya-risk-score-beta",
+        params={"user_id": user_id},
+        headers={"Authorization": f"Bearer {DataPulse_API_KEY}"},
+        timeout=HTTP_TIMEOUT
+    )
+    response.raise_for_status()
+    return response.json()
 
 # --- App UI ---
 st.title("🏦 Kenya Loan Eligibility Checker")
@@ -15,66 +59,69 @@ st.markdown("""
 This app checks loan eligibility using DataPulse's **Kenya Risk Score API**.
 """)
 
-# User input form
-with st.form("loan_form"):
-    user_id = st.text_input("User ID", placeholder="e.g., CUST-12345 , to be provided")
-    loan_amount = st.number_input("Loan Amount (KES)", min_value=1000, value=50000)
-    submitted = st.form_submit_button("Check Eligibility")
+# Only this fragment reruns on submit; the header above is left untouched
+@st.fragment
+def loan_form():
+    # User input form
+    with st.form("loan_form"):
+        user_id = st.text_input("User ID", placeholder="e.g., CUST-12345 , to be provided")
+        loan_amount = st.number_input("Loan Amount (KES)", min_value=1000, value=50000)
+        submitted = st.form_submit_button("Check Eligibility")
 
-# --- API Integration ---
-if submitted:
+    # --- API Integration ---
+    if not submitted:
+        return
     if not user_id:
         st.error("Please enter a User ID!")
-    else:
-        with st.spinner("Checking risk score..."):
-            try:
-                # Step 1: Call DataPulse API
-                response = requests.get(
-                    "https://api.DataPulse.com/v10/kenya-risk-score-beta",
-                    params={"user_id": user_id},
-                    headers={"Authorization": f"Bearer {DataPulse_API_KEY}"}
-                )
-                response.raise_for_status()
-                risk_data = response.json()
-
-                # Step 2: Decision Logic
-                risk_score = risk_data.get("risk_score", 0)
-                decision = "Rejected"
-                reason = "High risk"
-
-                if risk_score >= 700:
-                    decision = "Approved"
-                    reason = "Low risk"
-                elif 500 <= risk_score < 700 and loan_amount <= 50000:
-                    decision = "Approved"
-                    reason = "Medium risk (limited amount)"
-
-                # Step 3: Display Results
-                st.subheader("📊 Results")
-                col1, col2 = st.columns(2)
-                col1.metric("Risk Score", risk_score)
-                col2.metric("Decision", decision)
-
-                st.info(f"**Reason:** {reason}")
-
-                # Step 4: Send Alert if Rejected (Slack/Email)
-                if decision == "Rejected" and SLACK_WEBHOOK_URL:
-                    alert_data = {
-                        "text": f"🚨 Loan Rejected\nUser: {user_id}\nScore: {risk_score}\nAmount: KES {loan_amount}"
-                    }
-                    requests.post(SLACK_WEBHOOK_URL, json=alert_data)
-
-            except Exception as e:
-                st.error(f"API Error: {str(e)}")
-
-# --- Database Logging (Optional) ---
-if submitted and 'risk_score' in locals():
-    st.divider()
-    st.write("### 📝 Audit Log")
-    st.json({
-        "user_id": user_id,
-        "risk_score": risk_score,
-        "loan_amount": loan_amount,
-        "decision": decision,
-        "timestamp": st.session_state.get("timestamp")
-    })
+        return
+
+    risk_score = None
+    with st.spinner("Checking risk score..."):
+        try:
+            # Step 1: Call DataPulse API
+            risk_data = fetch_risk(user_id)
+
+            # Step 2: Decision Logic
+            risk_score = risk_data.get("risk_score", 0)
+            decision = "Rejected"
+            reason = "High risk"
+
+            if risk_score >= 700:
+                decision = "Approved"
+                reason = "Low risk"
+            elif 500 <= risk_score < 700 and loan_amount <= 50000:
+                decision = "Approved"
+                reason = "Medium risk (limited amount)"
+
+            # Step 3: Display Results
+            st.subheader("📊 Results")
+            col1, col2 = st.columns(2)
+            col1.metric("Risk Score", risk_score)
+            col2.metric("Decision", decision)
+
+            st.info(f"**Reason:** {reason}")
+
+            # Step 4: Send Alert if Rejected (Slack/Email)
+            if decision == "Rejected" and SLACK_WEBHOOK_URL:
+                alert_data = {
+                    "text": f"🚨 Loan Rejected\nUser: {user_id}\nScore: {risk_score}\nAmount: KES {loan_amount}"
+                }
+                # Fire and forget so the UI isn't blocked on the webhook round-trip
+                threading.Thread(target=_send_slack_alert, args=(_http(), alert_data), daemon=True).start()
+
+        except Exception as e:
+            st.error(f"API Error: {str(e)}")
+
+    # --- Database Logging (Optional) ---
+    if risk_score is not None:
+        st.divider()
+        st.write("### 📝 Audit Log")
+        st.json({
+            "user_id": user_id,
+            "risk_score": risk_score,
+            "loan_amount": loan_amount,
+            "decision": decision,
+            "timestamp": st.session_state.get("timestamp")
+        })
+
+loan_form()